@@ -6,16 +6,21 @@ Works on both Windows and Linux systems
 """
 
 import os
+import stat
 import sys
 from pathlib import Path
 import platform
 import glob
+from dataclasses import dataclass, field
 
 # Check if we're on Windows
 IS_WINDOWS = platform.system() == 'Windows'
 
+# Only colour interactive output, and honour NO_COLOR (https://no-color.org)
+USE_COLOR = sys.stdout.isatty() and not os.environ.get('NO_COLOR')
+
 # Enable ANSI colors on Windows 10+
-if IS_WINDOWS:
+if IS_WINDOWS and USE_COLOR:
     try:
         import ctypes
         kernel32 = ctypes.windll.kernel32
@@ -23,13 +28,13 @@ if IS_WINDOWS:
     except:
         pass
 
-# ANSI color codes for terminal output
-GREEN = '\033[92m'
-RED = '\033[91m'
-YELLOW = '\033[93m'
-BLUE = '\033[94m'
-RESET = '\033[0m'
-BOLD = '\033[1m'
+# ANSI color codes for terminal output (empty when output isn't a terminal)
+GREEN = '\033[92m' if USE_COLOR else ''
+RED = '\033[91m' if USE_COLOR else ''
+YELLOW = '\033[93m' if USE_COLOR else ''
+BLUE = '\033[94m' if USE_COLOR else ''
+RESET = '\033[0m' if USE_COLOR else ''
+BOLD = '\033[1m' if USE_COLOR else ''
 
 # Path separator for display
 PATH_SEP = '\\' if IS_WINDOWS else '/'
@@ -41,6 +46,24 @@ REQUIRED_STRUCTURE = {
     'REQUESTINFO': []
 }
 
+# REQUIRED_STRUCTURE flattened into relative path parts, parents before children
+_REQUIRED_RELS = tuple(
+    rel
+    for main_dir, subdirs in REQUIRED_STRUCTURE.items()
+    for rel in [(main_dir,)] + [(main_dir, subdir) for subdir in subdirs]
+)
+_REQUIRED_PARENTS = frozenset(rel[:-1] for rel in _REQUIRED_RELS if len(rel) > 1)
+
+# Directories (relative to the base) whose contents are scanned for SB tests
+SB_FILE_DIRS = (('NVA', 'NESSUS'), ('NVA', 'NMAP'))
+
+@dataclass
+class FileCheckResult:
+    """Results of the required file checks"""
+    missing: list = field(default_factory=list)
+    existing: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+
 def get_base_prefix(base_path):
     """Extract the XXXXXX prefix from the base directory name"""
     base_name = os.path.basename(base_path)
@@ -56,97 +79,103 @@ def format_path_for_display(path, base_path):
     else:
         return rel_path.replace('\\', '/')
 
-def check_sb_files(base_path):
+def scan_dir_names(dir_path):
     """
-    Check for required files in SB type test
+    List the subdirectories of a directory with a single scandir pass
+    
+    Raises:
+        FileNotFoundError, NotADirectoryError: if dir_path is not a directory
     
     Returns:
-        tuple: (missing_files, existing_files, file_issues)
+        set: subdirectory names, normalised with os.path.normcase
     """
-    missing_files = []
-    existing_files = []
-    file_issues = []
-    
-    base_prefix = get_base_prefix(base_path)
-    
-    # Check NESSUS folder for .nessus file
-    nessus_path = base_path / 'NVA' / 'NESSUS'
-    if nessus_path.exists():
-        nessus_files = list(nessus_path.glob('*.nessus'))
-        if nessus_files:
-            existing_files.append(f"NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus ({len(nessus_files)} file(s) found)")
-        else:
-            missing_files.append(f"NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus")
-    
-    # Check NMAP folder for specific files
-    nmap_path = base_path / 'NVA' / 'NMAP'
-    if nmap_path.exists():
-        required_nmap_files = [
-            f"{base_prefix}_TCP.gnmap",
-            f"{base_prefix}_TCP.nmap",
-            f"{base_prefix}_TCP.xml",
-            f"{base_prefix}_UDP.gnmap",
-            f"{base_prefix}_UDP.nmap",
-            f"{base_prefix}_UDP.xml"
-        ]
-        
-        for file_name in required_nmap_files:
-            file_path = nmap_path / file_name
-            if file_path.exists():
-                existing_files.append(f"NVA{PATH_SEP}NMAP{PATH_SEP}{file_name}")
-            else:
-                missing_files.append(f"NVA{PATH_SEP}NMAP{PATH_SEP}{file_name}")
+    with os.scandir(dir_path) as it:
+        return {os.path.normcase(entry.name) for entry in it if entry.is_dir()}
+
+def _walk_expected(base_path, rel_dirs):
+    """
+    Scan each expected file directory once
     
-    # Check REQUESTINFO for Attack Surface Profile
-    requestinfo_path = base_path / 'REQUESTINFO'
-    if requestinfo_path.exists():
-        attack_surface_file = f"{base_prefix}-Attack Surface Profile.xlsx"
-        file_path = requestinfo_path / attack_surface_file
-        
-        if file_path.exists():
-            file_size = file_path.stat().st_size
-            file_size_kb = file_size / 1024
-            
-            if file_size_kb > 25:
-                existing_files.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} ({file_size_kb:.1f} KB)")
-            else:
-                file_issues.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} - File too small ({file_size_kb:.1f} KB, requires > 25 KB)")
-        else:
-            missing_files.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file}")
+    Directories that don't exist are skipped; check_directory_structure
+    already reports them as missing.
     
-    return missing_files, existing_files, file_issues
+    Yields:
+        tuple: (rel_dir, file_entries) for each directory in rel_dirs
+    """
+    for rel_dir in rel_dirs:
+        try:
+            with os.scandir(os.path.join(base_path, *rel_dir)) as it:
+                entries = [entry for entry in it if entry.is_file()]
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        yield rel_dir, entries
 
-def check_other_files(base_path):
+def check_files(base_path, test_type):
     """
-    Check for required files in non-SB type tests
+    Check for required files for the given test type
+    
+    SB tests need the NESSUS and NMAP scan output plus the Attack Surface
+    Profile; all other test types only need the Attack Surface Profile.
     
     Returns:
-        tuple: (missing_files, existing_files, file_issues)
+        FileCheckResult: missing files, existing files and file issues
     """
-    missing_files = []
-    existing_files = []
-    file_issues = []
+    result = FileCheckResult()
+    
+    base_str = os.fspath(base_path)
+    base_prefix = get_base_prefix(base_str)
+    required_nmap_files = [
+        f"{base_prefix}_TCP.gnmap",
+        f"{base_prefix}_TCP.nmap",
+        f"{base_prefix}_TCP.xml",
+        f"{base_prefix}_UDP.gnmap",
+        f"{base_prefix}_UDP.nmap",
+        f"{base_prefix}_UDP.xml"
+    ]
+    attack_surface_file = f"{base_prefix}-Attack Surface Profile.xlsx"
+    
+    rel_dirs = SB_FILE_DIRS if test_type.upper() == 'SB' else ()
+    for rel_dir, entries in _walk_expected(base_str, rel_dirs):
+        if rel_dir == ('NVA', 'NESSUS'):
+            # Any .nessus file will do
+            nessus_count = sum(1 for entry in entries if os.path.normcase(entry.name).endswith('.nessus'))
+            if nessus_count:
+                result.existing.append(f"NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus ({nessus_count} file(s) found)")
+            else:
+                result.missing.append(f"NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus")
+        
+        elif rel_dir == ('NVA', 'NMAP'):
+            # normcase matches names case-insensitively on Windows; the exists()
+            # fallback covers other case-insensitive filesystems (e.g. macOS)
+            present = {os.path.normcase(entry.name) for entry in entries}
+            nmap_dir = os.path.join(base_str, *rel_dir)
+            for file_name in required_nmap_files:
+                if (os.path.normcase(file_name) in present
+                        or os.path.isfile(os.path.join(nmap_dir, file_name))):
+                    result.existing.append(f"NVA{PATH_SEP}NMAP{PATH_SEP}{file_name}")
+                else:
+                    result.missing.append(f"NVA{PATH_SEP}NMAP{PATH_SEP}{file_name}")
     
-    base_prefix = get_base_prefix(base_path)
+    # The Attack Surface Profile name is known up front, so a single stat()
+    # covers both existence and size without listing REQUESTINFO
+    requestinfo_dir = os.path.join(base_str, 'REQUESTINFO')
+    try:
+        st = os.stat(os.path.join(requestinfo_dir, attack_surface_file))
+    except (FileNotFoundError, NotADirectoryError):
+        st = None
     
-    # Only check REQUESTINFO for Attack Surface Profile
-    requestinfo_path = base_path / 'REQUESTINFO'
-    if requestinfo_path.exists():
-        attack_surface_file = f"{base_prefix}-Attack Surface Profile.xlsx"
-        file_path = requestinfo_path / attack_surface_file
+    if st is not None and stat.S_ISREG(st.st_mode):
+        file_size_kb = st.st_size / 1024
         
-        if file_path.exists():
-            file_size = file_path.stat().st_size
-            file_size_kb = file_size / 1024
-            
-            if file_size_kb > 25:
-                existing_files.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} ({file_size_kb:.1f} KB)")
-            else:
-                file_issues.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} - File too small ({file_size_kb:.1f} KB, requires > 25 KB)")
+        if file_size_kb > 25:
+            result.existing.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} ({file_size_kb:.1f} KB)")
         else:
-            missing_files.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file}")
+            result.issues.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file} - File too small ({file_size_kb:.1f} KB, requires > 25 KB)")
+    elif os.path.isdir(requestinfo_dir):
+        # A missing REQUESTINFO is already reported by the directory check
+        result.missing.append(f"REQUESTINFO{PATH_SEP}{attack_surface_file}")
     
-    return missing_files, existing_files, file_issues
+    return result
 
 def check_directory_structure(base_path):
     """
@@ -158,95 +187,105 @@ def check_directory_structure(base_path):
     Returns:
         tuple: (is_valid, missing_dirs, existing_dirs)
     """
-    base_path = Path(base_path)
+    # Normalise once through Path, then work on plain strings
+    base_str = str(Path(base_path))
     missing_dirs = []
     existing_dirs = []
     
-    # Check if base directory exists
-    if not base_path.exists():
-        return False, [str(base_path)], []
-    
-    if not base_path.is_dir():
-        return False, [f"{base_path} (not a directory)"], []
-    
-    existing_dirs.append(str(base_path))
-    
-    # Check main subdirectories
-    for main_dir, subdirs in REQUIRED_STRUCTURE.items():
-        main_path = base_path / main_dir
+    # Scan the base directory once; this also checks that it exists
+    try:
+        base_dirs = scan_dir_names(base_str)
+    except FileNotFoundError:
+        return False, [base_str], []
+    except NotADirectoryError:
+        return False, [f"{base_str} (not a directory)"], []
+    
+    existing_dirs.append(base_str)
+    
+    # Subdirectory names of each scanned parent, keyed by relative path
+    dir_names = {(): base_dirs}
+    
+    for rel in _REQUIRED_RELS:
+        parent_names = dir_names.get(rel[:-1])
+        if parent_names is None:
+            # Parent is missing and has already been reported
+            continue
         
-        if not main_path.exists():
-            missing_dirs.append(str(main_path))
+        dir_path = os.path.join(base_str, *rel)
+        # normcase matches names case-insensitively on Windows; the isdir()
+        # fallback covers other case-insensitive filesystems (e.g. macOS)
+        if (os.path.normcase(rel[-1]) not in parent_names
+                and not os.path.isdir(dir_path)):
+            missing_dirs.append(dir_path)
         else:
-            existing_dirs.append(str(main_path))
-            
-            # Check subdirectories
-            for subdir in subdirs:
-                sub_path = main_path / subdir
-                if not sub_path.exists():
-                    missing_dirs.append(str(sub_path))
-                else:
-                    existing_dirs.append(str(sub_path))
+            existing_dirs.append(dir_path)
+            if rel in _REQUIRED_PARENTS:
+                dir_names[rel] = scan_dir_names(dir_path)
     
     return len(missing_dirs) == 0, missing_dirs, existing_dirs
 
-def print_results(base_path, test_type, dir_valid, missing_dirs, existing_dirs, 
-                 missing_files, existing_files, file_issues):
+def print_results(base_path, test_type, dir_valid, missing_dirs, existing_dirs, files):
     """Print the QC results in a formatted way"""
-    print(f"\n{BOLD}Directory Structure & File QC Report{RESET}")
-    print(f"{BLUE}{'='*60}{RESET}")
-    print(f"{BOLD}Base Directory:{RESET} {base_path}")
-    print(f"{BOLD}Test Type:{RESET} {test_type.upper()}")
-    print(f"{BOLD}Platform:{RESET} {platform.system()}")
-    print(f"{BLUE}{'='*60}{RESET}\n")
+    # Collect the report and emit it with a single write
+    out = []
+    missing_files = files.missing
+    existing_files = files.existing
+    file_issues = files.issues
+    
+    out.append(f"\n{BOLD}Directory Structure & File QC Report{RESET}")
+    out.append(f"{BLUE}{'='*60}{RESET}")
+    out.append(f"{BOLD}Base Directory:{RESET} {base_path}")
+    out.append(f"{BOLD}Test Type:{RESET} {test_type.upper()}")
+    out.append(f"{BOLD}Platform:{RESET} {platform.system()}")
+    out.append(f"{BLUE}{'='*60}{RESET}\n")
     
     # Print directory status
-    print(f"{BOLD}DIRECTORY STRUCTURE:{RESET}")
-    print(f"{BLUE}{'-'*30}{RESET}")
+    out.append(f"{BOLD}DIRECTORY STRUCTURE:{RESET}")
+    out.append(f"{BLUE}{'-'*30}{RESET}")
     
     # Print existing directories
     if existing_dirs:
-        print(f"{GREEN}{BOLD}✓ Existing Directories:{RESET}")
+        out.append(f"{GREEN}{BOLD}✓ Existing Directories:{RESET}")
         for dir_path in existing_dirs:
             formatted_path = format_path_for_display(dir_path, base_path)
-            print(f"  {GREEN}✓{RESET} {formatted_path}")
+            out.append(f"  {GREEN}✓{RESET} {formatted_path}")
     
     # Print missing directories
     if missing_dirs:
-        print(f"\n{RED}{BOLD}✗ Missing Directories:{RESET}")
+        out.append(f"\n{RED}{BOLD}✗ Missing Directories:{RESET}")
         for dir_path in missing_dirs:
             formatted_path = format_path_for_display(dir_path, base_path)
-            print(f"  {RED}✗{RESET} {formatted_path}")
+            out.append(f"  {RED}✗{RESET} {formatted_path}")
     
     # Print file status
-    print(f"\n{BOLD}FILE CHECKS:{RESET}")
-    print(f"{BLUE}{'-'*30}{RESET}")
+    out.append(f"\n{BOLD}FILE CHECKS:{RESET}")
+    out.append(f"{BLUE}{'-'*30}{RESET}")
     
     # Print existing files
     if existing_files:
-        print(f"{GREEN}{BOLD}✓ Existing Files:{RESET}")
+        out.append(f"{GREEN}{BOLD}✓ Existing Files:{RESET}")
         for file_info in existing_files:
-            print(f"  {GREEN}✓{RESET} {file_info}")
+            out.append(f"  {GREEN}✓{RESET} {file_info}")
     
     # Print missing files
     if missing_files:
-        print(f"\n{RED}{BOLD}✗ Missing Files:{RESET}")
+        out.append(f"\n{RED}{BOLD}✗ Missing Files:{RESET}")
         for file_info in missing_files:
-            print(f"  {RED}✗{RESET} {file_info}")
+            out.append(f"  {RED}✗{RESET} {file_info}")
     
     # Print file issues
     if file_issues:
-        print(f"\n{YELLOW}{BOLD}⚠ File Issues:{RESET}")
+        out.append(f"\n{YELLOW}{BOLD}⚠ File Issues:{RESET}")
         for issue in file_issues:
-            print(f"  {YELLOW}⚠{RESET} {issue}")
+            out.append(f"  {YELLOW}⚠{RESET} {issue}")
     
     # Overall status
     files_valid = len(missing_files) == 0 and len(file_issues) == 0
     all_valid = dir_valid and files_valid
     
-    print(f"\n{BLUE}{'='*60}{RESET}")
+    out.append(f"\n{BLUE}{'='*60}{RESET}")
     if all_valid:
-        print(f"{GREEN}{BOLD}QC PASSED:{RESET} All required directories and files exist!")
+        out.append(f"{GREEN}{BOLD}QC PASSED:{RESET} All required directories and files exist!")
     else:
         issues = []
         if missing_dirs:
@@ -256,37 +295,50 @@ def print_results(base_path, test_type, dir_valid, missing_dirs, existing_dirs,
         if file_issues:
             issues.append(f"{len(file_issues)} file issues")
         
-        print(f"{RED}{BOLD}QC FAILED:{RESET} {', '.join(issues)}")
-    print(f"{BLUE}{'='*60}{RESET}\n")
+        out.append(f"{RED}{BOLD}QC FAILED:{RESET} {', '.join(issues)}")
+    out.append(f"{BLUE}{'='*60}{RESET}\n")
     
+    sys.stdout.write('\n'.join(out) + '\n')
     return all_valid
 
+# Expected structure text, built once and written in one go
+_EXPECTED_STRUCTURE_LINES = [
+    f"\n{YELLOW}{BOLD}Expected Directory Structure:{RESET}",
+    f"{YELLOW}XXXXXX-XXXXXXXX{PATH_SEP}{RESET}",
+    f"{YELLOW}├── NVA{PATH_SEP}{RESET}",
+    f"{YELLOW}│   ├── NESSUS{PATH_SEP}{RESET}",
+    f"{YELLOW}│   ├── NMAP{PATH_SEP}{RESET}",
+    f"{YELLOW}│   └── QUALYS{PATH_SEP}{RESET}",
+    f"{YELLOW}├── REPORTS{PATH_SEP}{RESET}",
+    f"{YELLOW}└── REQUESTINFO{PATH_SEP}{RESET}\n",
+    f"{YELLOW}{BOLD}Expected Files:{RESET}",
+]
+
+_SB_EXPECTED_TEXT = '\n'.join(_EXPECTED_STRUCTURE_LINES + [
+    f"{YELLOW}For SB Test Type:{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus (any .nessus file){RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.gnmap{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.nmap{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.xml{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.gnmap{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.nmap{RESET}",
+    f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.xml{RESET}",
+    f"{YELLOW}  REQUESTINFO{PATH_SEP}XXXXXX-Attack Surface Profile.xlsx (>25KB){RESET}",
+    "",
+]) + '\n'
+
+_OTHER_EXPECTED_TEXT = '\n'.join(_EXPECTED_STRUCTURE_LINES + [
+    f"{YELLOW}For Other Test Types:{RESET}",
+    f"{YELLOW}  REQUESTINFO{PATH_SEP}XXXXXX-Attack Surface Profile.xlsx (>25KB){RESET}",
+    "",
+]) + '\n'
+
 def print_expected_structure(test_type):
     """Print the expected directory structure and files"""
-    print(f"\n{YELLOW}{BOLD}Expected Directory Structure:{RESET}")
-    print(f"{YELLOW}XXXXXX-XXXXXXXX{PATH_SEP}{RESET}")
-    print(f"{YELLOW}├── NVA{PATH_SEP}{RESET}")
-    print(f"{YELLOW}│   ├── NESSUS{PATH_SEP}{RESET}")
-    print(f"{YELLOW}│   ├── NMAP{PATH_SEP}{RESET}")
-    print(f"{YELLOW}│   └── QUALYS{PATH_SEP}{RESET}")
-    print(f"{YELLOW}├── REPORTS{PATH_SEP}{RESET}")
-    print(f"{YELLOW}└── REQUESTINFO{PATH_SEP}{RESET}\n")
-    
-    print(f"{YELLOW}{BOLD}Expected Files:{RESET}")
     if test_type.upper() == 'SB':
-        print(f"{YELLOW}For SB Test Type:{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NESSUS{PATH_SEP}*.nessus (any .nessus file){RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.gnmap{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.nmap{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_TCP.xml{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.gnmap{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.nmap{RESET}")
-        print(f"{YELLOW}  NVA{PATH_SEP}NMAP{PATH_SEP}XXXXXX_UDP.xml{RESET}")
-        print(f"{YELLOW}  REQUESTINFO{PATH_SEP}XXXXXX-Attack Surface Profile.xlsx (>25KB){RESET}")
+        sys.stdout.write(_SB_EXPECTED_TEXT)
     else:
-        print(f"{YELLOW}For Other Test Types:{RESET}")
-        print(f"{YELLOW}  REQUESTINFO{PATH_SEP}XXXXXX-Attack Surface Profile.xlsx (>25KB){RESET}")
-    print()
+        sys.stdout.write(_OTHER_EXPECTED_TEXT)
 
 def main():
     """Main function"""
@@ -311,14 +363,11 @@ def main():
     dir_valid, missing_dirs, existing_dirs = check_directory_structure(base_path)
     
     # Check files based on test type
-    if test_type.upper() == 'SB':
-        missing_files, existing_files, file_issues = check_sb_files(base_path)
-    else:
-        missing_files, existing_files, file_issues = check_other_files(base_path)
+    files = check_files(base_path, test_type)
     
     # Print results
     success = print_results(base_directory, test_type, dir_valid, missing_dirs, 
-                          existing_dirs, missing_files, existing_files, file_issues)
+                          existing_dirs, files)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
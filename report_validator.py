@@ -1,18 +1,47 @@
-import pdfplumber
+import os
 import re
+import json
+import hashlib
+import importlib.metadata
 import logging
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Iterable, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# On-disk cache of first-page text/tables, keyed by PDF path, mtime and size.
+# Reports are confidential, so setting REPORT_VALIDATOR_NO_CACHE turns it off.
+DEFAULT_CACHE_DIR = None if os.environ.get('REPORT_VALIDATOR_NO_CACHE') else os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'report_validator'
+)
+CACHE_MAX_ENTRIES = 256
+# Bump whenever extract_text/_extract_table_map output changes to invalidate old entries
+CACHE_VERSION = 1
+
+def _pdfplumber_version() -> str:
+    """
+    Installed pdfplumber version, read from package metadata without importing it.
+    """
+    try:
+        return importlib.metadata.version('pdfplumber')
+    except importlib.metadata.PackageNotFoundError:
+        return ''
+
 class PenetrationTestReportValidator:
     """
     Refactored PDF header validator with table extraction and improved regex anchoring.
     """
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        # Where extracted page data is cached between runs; None disables the cache
+        self.cache_dir = cache_dir
+
         # Define which fields are required and their types
         self.required_fields = {
             'Preliminary Date':    {'required': True, 'type': 'date'},
@@ -39,6 +68,45 @@ class PenetrationTestReportValidator:
             r"{field}[^\n]*\n\s*([^\n\r]+)"
         ]
 
+        # Only these table keys are ever looked up
+        self._field_set = frozenset(self.required_fields)
+
+        # Pre-compile all patterns once so extraction doesn't rebuild them per call
+        self._compiled_custom = {
+            field: [re.compile(p, re.IGNORECASE) for p in (pats if isinstance(pats, list) else [pats])]
+            for field, pats in self.custom_patterns.items()
+        }
+        # All custom patterns as one alternation, so a single pass over the page
+        # finds every field. Each alternative sits in a lookahead so matches
+        # never consume text another field's pattern could start in.
+        self._custom_alternatives: List[Tuple[str, int]] = []  # (field, priority within field)
+        alternatives = []
+        for field, compiled in self._compiled_custom.items():
+            for priority, pat in enumerate(compiled):
+                alternatives.append(f"(?=(?P<f{len(self._custom_alternatives)}>{pat.pattern}))")
+                self._custom_alternatives.append((field, priority))
+        self._combined_custom = re.compile("|".join(alternatives), re.IGNORECASE)
+
+        self._compiled_generic = {
+            field: [re.compile(pat.format(field=re.escape(field)), re.IGNORECASE | re.MULTILINE)
+                    for pat in self.generic_patterns]
+            for field in self.required_fields
+        }
+        self._compiled_same_line = {
+            field: re.compile(rf"^{re.escape(field)}\s*[:]?\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+            for field in ('Report Status', 'IP Address')
+        }
+        self._header_split_re = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, self.required_fields.keys())) + r")\b"
+        )
+        # Range-checks octets in the regex engine: an in-range address matches the
+        # first group; any other dotted quad falls through to the second.
+        # Zero-padded octets (e.g. 010) are in range, as int() always treated them.
+        octet = r'(?:25[0-5]|2[0-4]\d|[01]?\d?\d)'
+        self._ip_re = re.compile(
+            rf'\b((?:{octet}\.){{3}}{octet})\b|\b((?:\d{{1,3}}\.){{3}}\d{{1,3}})\b'
+        )
+
         # Map types to validator functions
         self.validators = {
             'date':   self._validate_date,
@@ -47,62 +115,98 @@ class PenetrationTestReportValidator:
             'ip':     self._validate_ips
         }
 
+        # Extracted field values keyed by page content, so re-validating a PDF
+        # (or a batch sharing template text) skips the regex chain
+        self._field_cache: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Dict[str, str]] = {}
+        self._field_cache_size = 128
+
     def _extract_table_map(self, page) -> Dict[str, str]:
         """
         Attempt to extract headers as table rows using extract_tables(): first cell -> second cell.
+        Rows whose first cell isn't a required field are skipped.
         """
         table_map = {}
         tables = page.extract_tables() or []
         for table in tables:
             for row in table:
                 if row and len(row) >= 2:
-                    key = row[0] or ''
-                    val = row[1] or ''
-                    table_map[key.strip()] = val.strip()
+                    key = (row[0] or '').strip()
+                    if key not in self._field_set:
+                        continue
+                    table_map[key] = (row[1] or '').strip()
         return table_map
 
-    def extract_field_value(self, page_text: str, page, field: str) -> str:
+    def extract_field_values_batch(self, page_text: str) -> Dict[str, str]:
+        """
+        Run every custom anchored pattern over the page in a single pass.
+        Gives the same value per field as searching its patterns one at a time, in order.
+        """
+        found: Dict[str, Tuple[int, str]] = {}
+        for m in self._combined_custom.finditer(page_text):
+            name = m.lastgroup
+            field, priority = self._custom_alternatives[int(name[1:])]
+            if field not in found or priority < found[field][0]:
+                # The pattern's own capture group directly follows the wrapper group
+                value = m.group(self._combined_custom.groupindex[name] + 1)
+                found[field] = (priority, value.strip())
+        return {field: value for field, (_, value) in found.items()}
+
+    def extract_field_value(self, page_text: str, table_map: Dict[str, str], field: str,
+                            custom_values: Optional[Dict[str, str]] = None) -> str:
         """
         Extract the raw value for a given header field:
         - For Report Status and IP Address, grab only the same-line substring.
-        - Otherwise first try table mapping, then fall back to regex.
+        - Otherwise first try the page's table_map, then fall back to regex.
+        custom_values, if given, is the result of extract_field_values_batch for page_text.
         """
         # Same-line simple extraction
-        if field in ('Report Status', 'IP Address'):
-            m = re.search(rf"^{re.escape(field)}\s*[:]?\s*(.+)$", page_text, re.IGNORECASE | re.MULTILINE)
+        same_line = self._compiled_same_line.get(field)
+        if same_line:
+            m = same_line.search(page_text)
             if m:
                 return m.group(1).strip()
 
         # Table-based extraction
-        table_map = self._extract_table_map(page)
         if field in table_map and table_map[field]:
             return table_map[field]
 
         # Custom anchored regex
-        pats = self.custom_patterns.get(field)
-        if pats:
-            if isinstance(pats, list):
-                for pat in pats:
-                    m = re.search(pat, page_text, re.IGNORECASE)
-                    if m:
-                        return m.group(1).strip()
-            else:
-                m = re.search(pats, page_text, re.IGNORECASE)
+        if custom_values is not None:
+            if field in custom_values:
+                return custom_values[field]
+        else:
+            for pat in self._compiled_custom.get(field, ()):
+                m = pat.search(page_text)
                 if m:
                     return m.group(1).strip()
 
         # Generic fallback
-        for pat in self.generic_patterns:
-            regex = pat.format(field=re.escape(field))
-            m = re.search(regex, page_text, re.IGNORECASE | re.MULTILINE)
+        for pat in self._compiled_generic.get(field, ()):
+            m = pat.search(page_text)
             if m:
                 val = m.group(1).strip()
                 # trim adjacent headers
-                val = re.split(r"\b(?:" + "|".join(map(re.escape, self.required_fields.keys())) + r")\b", val)[0].strip()
+                val = self._header_split_re.split(val)[0].strip()
                 return val
 
         return ''
 
+    def extract_fields(self, page_text: str, table_map: Dict[str, str]) -> Dict[str, str]:
+        """
+        Extract every required field from a page, memoized on the page text and table map.
+        """
+        key = (page_text, tuple(table_map.items()))
+        values = self._field_cache.get(key)
+        if values is None:
+            custom_values = self.extract_field_values_batch(page_text)
+            values = {field: self.extract_field_value(page_text, table_map, field, custom_values)
+                      for field in self.required_fields}
+            if len(self._field_cache) >= self._field_cache_size:
+                # Evict the oldest entry
+                self._field_cache.pop(next(iter(self._field_cache)), None)
+            self._field_cache[key] = values
+        return values
+
     def _validate_date(self, date_str: str) -> Tuple[bool, str]:
         if not date_str:
             return False, "Date field is empty"
@@ -130,37 +234,148 @@ class PenetrationTestReportValidator:
         return True, "Valid text"
 
     def _validate_ips(self, ip_block: str) -> Tuple[bool, str]:
-        ips = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', ip_block)
-        if not ips:
+        matches = self._ip_re.findall(ip_block)
+        if not matches:
             return False, "No IPs found"
-        bad = [ip for ip in ips if any(int(o) not in range(256) for o in ip.split('.'))]
+        ips = [ok for ok, _ in matches if ok]
+        bad = [b for _, b in matches if b]
         if bad:
             return False, f"Out-of-range IPs: {', '.join(bad)}"
         return True, f"IPs found: {', '.join(ips)}"
 
+    def _cache_path(self, pdf_path: str) -> Optional[str]:
+        """
+        Cache file for a PDF, keyed by its absolute path, mtime and size plus the
+        cache format and pdfplumber versions (None if caching is off).
+        """
+        if not self.cache_dir:
+            return None
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            return None
+        fields = ','.join(self.required_fields)
+        raw = (f"{CACHE_VERSION}-{_pdfplumber_version()}-"
+               f"{st.st_mtime_ns}-{st.st_size}-{os.path.abspath(pdf_path)}-{fields}")
+        key = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self, cache_path: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Load a cache entry, or None if it is missing or unreadable.
+        """
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        # Anything not shaped like a _write_cache entry is treated as a miss
+        if not isinstance(data, dict):
+            return None
+        text = data.get('text')
+        table_map = data.get('table_map')
+        if not isinstance(text, str) or not isinstance(table_map, dict):
+            return None
+        if not all(isinstance(k, str) and isinstance(v, str) for k, v in table_map.items()):
+            return None
+
+        # Bump the mtime so the LRU sweep keeps recently used entries; a
+        # read-only cache dir still serves hits
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return text, table_map
+
+    def _write_cache(self, cache_path: str, text: str, table_map: Dict[str, str]) -> None:
+        """
+        Atomically write a cache entry, then evict the least recently used entries over the limit.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'text': text, 'table_map': table_map}, f)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            with os.scandir(self.cache_dir) as it:
+                entries = [e for e in it if e.name.endswith('.json')]
+            if len(entries) > CACHE_MAX_ENTRIES:
+                entries.sort(key=lambda e: e.stat().st_mtime_ns)
+                for e in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+                    os.unlink(e.path)
+        except OSError as e:
+            logger.debug(f"Could not update page cache: {e}")
+
+    def _read_first_page(self, pdf_path: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Return the first page's text and table map, skipping pdfplumber on a cache hit.
+        """
+        cache_path = self._cache_path(pdf_path)
+        if cache_path:
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                return cached
+
+        # Deferred so importing this module (or a cache hit) doesn't pay for pdfminer
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            page = pdf.pages[0]
+            text = page.extract_text() or ''
+            table_map = self._extract_table_map(page)
+        if cache_path:
+            self._write_cache(cache_path, text, table_map)
+        return text, table_map
+
     def validate_pdf(self, pdf_path: str) -> Dict:
         results = {'file': pdf_path, 'passed': True, 'fields': {}, 'errors': []}
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                page = pdf.pages[0]
-                text = page.extract_text() or ''
-                for field, cfg in self.required_fields.items():
-                    val = self.extract_field_value(text, page, field)
-                    typ = cfg['type']
-                    if typ == 'status':
-                        ok, msg = self.validators[typ](val, cfg['expected'])
-                    else:
-                        ok, msg = self.validators[typ](val) if typ != 'text' else self.validators[typ](val, field)
-                    results['fields'][field] = {'value': val, 'valid': ok, 'msg': msg}
-                    if not ok:
-                        results['passed'] = False
-                        results['errors'].append(f"{field}: {msg}")
+            text, table_map = self._read_first_page(pdf_path)
+            values = self.extract_fields(text, table_map)
+            for field, cfg in self.required_fields.items():
+                val = values[field]
+                typ = cfg['type']
+                if typ == 'status':
+                    ok, msg = self.validators[typ](val, cfg['expected'])
+                else:
+                    ok, msg = self.validators[typ](val) if typ != 'text' else self.validators[typ](val, field)
+                results['fields'][field] = {'value': val, 'valid': ok, 'msg': msg}
+                if not ok:
+                    results['passed'] = False
+                    results['errors'].append(f"{field}: {msg}")
         except Exception as e:
             logger.error(f"Failed to open or parse PDF: {e}")
             results['passed'] = False
             results['errors'].append(str(e))
         return results
 
+    def validate_many(self, paths: Iterable[str], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Validate several PDFs in parallel worker processes, returning results in input order.
+        pdfminer parsing is CPU-bound and holds the GIL, so threads would not help.
+        Each worker builds a validator of this instance's class and cache settings.
+        """
+        paths = list(paths)
+        # No more workers than files, and no pool at all if only one would run
+        workers = min(max_workers or os.cpu_count() or 1, len(paths))
+        if workers < 2:
+            return [self.validate_pdf(p) for p in paths]
+        # Batch files to amortise IPC only once every worker has a few chunks
+        chunksize = max(1, min(4, len(paths) // (workers * 4)))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(type(self), self.cache_dir)) as ex:
+                return list(ex.map(_validate_one_worker, paths, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            logger.warning(f"Worker pool failed ({e}); validating sequentially")
+            return [self.validate_pdf(p) for p in paths]
+
     def generate_report(self, res: Dict) -> str:
         lines = ["PDF HEADER VALIDATION REPORT", "="*40]
         lines.append(f"File: {res['file']}")
@@ -175,13 +390,52 @@ class PenetrationTestReportValidator:
                 lines.append(f" - {e}")
         return "\n".join(lines)
 
+_validator = None
+_validator_lock = threading.Lock()
+
+def _get_validator() -> PenetrationTestReportValidator:
+    """
+    Return the shared validator, building it (and its compiled patterns) on first use.
+    """
+    global _validator
+    if _validator is None:
+        with _validator_lock:
+            if _validator is None:
+                _validator = PenetrationTestReportValidator()
+    return _validator
+
+def validate(pdf_path: str) -> Dict:
+    """
+    Validate a PDF with the shared validator instance.
+    """
+    return _get_validator().validate_pdf(pdf_path)
+
+_worker_validator = None
+
+def _init_worker(validator_cls: type, cache_dir: Optional[str]) -> None:
+    """
+    Process pool initializer; builds the validator this worker reuses for every file.
+    """
+    global _worker_validator
+    _worker_validator = validator_cls(cache_dir=cache_dir)
+
+def _validate_one_worker(pdf_path: str) -> Dict:
+    """
+    Process pool entry point.
+    """
+    return _worker_validator.validate_pdf(pdf_path)
+
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) != 2:
-        print(f"Usage: {sys.argv[0]} <report.pdf>")
+    args = sys.argv[1:]
+    no_cache = '--no-cache' in args
+    pdf_paths = [a for a in args if a != '--no-cache']
+    if not pdf_paths:
+        print(f"Usage: {sys.argv[0]} [--no-cache] <report.pdf> [report.pdf ...]")
+        print("Set REPORT_VALIDATOR_NO_CACHE=1 or pass --no-cache to avoid caching report text on disk")
         sys.exit(1)
-    validator = PenetrationTestReportValidator()
-    results = validator.validate_pdf(sys.argv[1])
-    print(validator.generate_report(results))
-    if not results['passed']:
+    validator = PenetrationTestReportValidator(cache_dir=None) if no_cache else _get_validator()
+    all_results = validator.validate_many(pdf_paths)
+    print("\n\n".join(validator.generate_report(results) for results in all_results))
+    if not all(results['passed'] for results in all_results):
         sys.exit(1)